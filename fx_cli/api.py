@@ -1,39 +1,114 @@
 """API module for fetching foreign exchange rates."""
 
-import requests
+import datetime
+import json
 import os
-from typing import Dict, Optional
-from dotenv import load_dotenv
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
 from pathlib import Path
 
-# Load environment variables
-load_dotenv()
+from .errors import FXAPIError
+from .validation import is_valid_date
 
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    _json = json
 
-class FXAPIError(Exception):
-    """Custom exception for FX API errors."""
-    pass
+# requests and dotenv are imported lazily to keep CLI startup fast
+
+# Matches an existing FX_API_KEY line in a .env file
+_API_KEY_LINE = re.compile(r'^FX_API_KEY=.*$', re.M)
+
+# Whether the local .env file has been loaded into os.environ yet
+_env_loaded = False
+
+# Parsed contents of ~/.config/fx-cli/.env, loaded at most once per process
+_config_values: Optional[Dict[str, Optional[str]]] = None
+
+
+def _write_private_file(path: Path, content: str):
+    """Create a new file readable only by the user (600) and write content to it."""
+    # The key is never exposed, not even briefly; on Windows the mode is ignored
+    # and file permissions are handled differently
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+
+def _utc_today() -> str:
+    """Return today's date in YYYY-MM-DD format, in UTC like the API's daily rates."""
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+def _ensure_env_loaded():
+    """Load the local .env file into the environment, once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
 
 
 class FXAPI:
     """Foreign Exchange API client."""
     
-    def __init__(self):
+    # Shared across instances so keep-alive connections are reused between calls
+    _session = None
+    
+    # In-memory LRU cache of rate tables: date -> (expires_at, rates)
+    _rates_cache: "OrderedDict[str, Tuple[float, Dict[str, float]]]" = OrderedDict()
+    _cache_maxsize = 256
+    _cache_ttl = 86400
+    # Today's (and future) rates still change, so they're only kept briefly
+    _live_cache_ttl = 300
+    
+    # Guards the shared session and cache when fetching dates concurrently
+    _lock = threading.Lock()
+    _max_workers = 8
+    
+    # (connect, read) timeouts in seconds, so a hung connection can't block forever
+    _timeout = (3.05, 10)
+    
+    def __init__(self, interactive: bool = True):
+        """
+        Args:
+            interactive: Prompt for an API key if none is configured; when False,
+                raise FXAPIError instead (e.g. for background processes)
+        """
         self.api_key = os.getenv('FX_API_KEY')
+        if not self.api_key:
+            # Only parse .env files when the key isn't already in the environment
+            _ensure_env_loaded()
+            self.api_key = os.getenv('FX_API_KEY')
         if not self.api_key:
             # Try to load from user's config directory
             self._load_api_key_from_config()
         if not self.api_key:
+            if not interactive:
+                raise FXAPIError(
+                    "FX_API_KEY not found. Set it in your environment or run fx once to save it "
+                    "to ~/.config/fx-cli/.env"
+                )
             self._prompt_for_api_key()
         self.base_url = "https://openexchangerates.org/api"
     
     def _load_api_key_from_config(self):
         """Load API key from user's config directory."""
-        config_file = Path.home() / ".config" / "fx-cli" / ".env"
-        if config_file.exists():
-            # Load the config file and set environment variable
-            load_dotenv(config_file)
-            self.api_key = os.getenv('FX_API_KEY')
+        global _config_values
+        if _config_values is None:
+            from dotenv import dotenv_values
+            config_file = Path.home() / ".config" / "fx-cli" / ".env"
+            _config_values = dotenv_values(config_file) if config_file.exists() else {}
+        self.api_key = _config_values.get('FX_API_KEY')
     
     def _prompt_for_api_key(self):
         """Prompt user for API key if not found in environment."""
@@ -64,36 +139,44 @@ class FXAPI:
         
         # Use .env file in config directory
         env_file = config_dir / ".env"
+        key_line = f'FX_API_KEY="{api_key}"'
         
-        # Read existing .env content
-        existing_content = ""
         if env_file.exists():
+            # Update or add FX_API_KEY, keeping any other settings
             existing_content = env_file.read_text()
+            content, updated = _API_KEY_LINE.subn(lambda _: key_line, existing_content, count=1)
+            if not updated:
+                if content and not content.endswith('\n'):
+                    content += '\n'
+                content += key_line + '\n'
+            
+            # Write to a sibling temp file and swap it in, so a crash can't corrupt the settings
+            tmp_file = env_file.with_name(env_file.name + ".tmp")
+            # Drop any leftover temp file, since an existing file would keep its old mode
+            tmp_file.unlink(missing_ok=True)
+            _write_private_file(tmp_file, content)
+            try:
+                os.replace(tmp_file, env_file)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
+        else:
+            # Nothing to preserve, so write the new file directly
+            _write_private_file(env_file, key_line + '\n')
         
-        # Update or add FX_API_KEY
-        lines = existing_content.split('\n') if existing_content else []
-        updated = False
-        
-        for i, line in enumerate(lines):
-            if line.startswith('FX_API_KEY='):
-                lines[i] = f'FX_API_KEY="{api_key}"'
-                updated = True
-                break
-        
-        if not updated:
-            lines.append(f'FX_API_KEY="{api_key}"')
-        
-        # Write back to .env file
-        env_file.write_text('\n'.join(lines))
-        
-        # Set file permissions to be readable only by user (600)
-        # Only set permissions on Unix-like systems (Windows doesn't support chmod)
-        try:
-            env_file.chmod(0o600)
-        except (NotImplementedError, OSError):
-            # Windows or other systems that don't support chmod
-            # On Windows, file permissions are handled differently
-            pass
+        # Keep the per-process config cache in sync with the file
+        if _config_values is not None:
+            _config_values['FX_API_KEY'] = api_key
+    
+    def reload_api_key(self) -> bool:
+        """Re-read the API key from the user's config file, returning True if it changed."""
+        global _config_values
+        old_key = self.api_key
+        _config_values = None
+        self._load_api_key_from_config()
+        if not self.api_key:
+            self.api_key = old_key
+        return self.api_key != old_key
     
     def refresh_api_key(self):
         """Prompt user for a new API key and save it."""
@@ -113,16 +196,143 @@ class FXAPI:
         Raises:
             FXAPIError: If API request fails
         """
+        with self._lock:
+            cached = self._rates_cache.get(date)
+            if cached is not None:
+                expires_at, rates = cached
+                if time.monotonic() < expires_at:
+                    self._rates_cache.move_to_end(date)
+                    return rates
+                del self._rates_cache[date]
+        
+        rates = self._load_rates_from_disk(date)
+        if rates is None:
+            rates = self._fetch_historical_rates(date)
+            self._save_rates_to_disk(date, rates)
+        
+        ttl = self._cache_ttl if date < _utc_today() else self._live_cache_ttl
+        with self._lock:
+            self._rates_cache[date] = (time.monotonic() + ttl, rates)
+            if len(self._rates_cache) > self._cache_maxsize:
+                self._rates_cache.popitem(last=False)
+        
+        return rates
+    
+    def get_historical_rates_many(self, dates: Iterable[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Get historical exchange rates for several dates in parallel.
+        
+        Args:
+            dates: Dates in YYYY-MM-DD format
+            
+        Returns:
+            Dictionary of dates to their currency rate dictionaries
+            
+        Raises:
+            FXAPIError: If any API request fails
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        unique_dates = list(dict.fromkeys(dates))
+        if len(unique_dates) <= 1:
+            return {date: self.get_historical_rates(date) for date in unique_dates}
+        
+        # Requests share the pooled session, so each worker reuses a keep-alive connection
+        workers = min(self._max_workers, len(unique_dates))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(self.get_historical_rates, unique_dates)
+            return dict(zip(unique_dates, results))
+    
+    @classmethod
+    def _get_session(cls):
+        """Return the shared requests session, creating it on first use."""
+        with cls._lock:
+            if cls._session is None:
+                cls._session = cls._create_session()
+        return cls._session
+    
+    @staticmethod
+    def _create_session():
+        """Create a requests session with connection pooling and retries."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # Transparently retry transient gateway errors with backoff
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        )
+        session = requests.Session()
+        session.headers.update({"accept": "application/json"})
+        session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry),
+        )
+        return session
+    
+    @staticmethod
+    def _rates_cache_file(date: str) -> Optional[Path]:
+        """Return the on-disk cache path for a date, or None if it can't be cached."""
+        # Only strict YYYY-MM-DD dates map to a file, which also keeps paths inside the cache dir
+        if not is_valid_date(date):
+            return None
+        # Rates for today (or later) are not final yet, so only past dates are cached
+        if date >= _utc_today():
+            return None
+        return Path.home() / ".cache" / "fx-cli" / f"{date}.json"
+    
+    def _load_rates_from_disk(self, date: str) -> Optional[Dict[str, float]]:
+        """Load cached rates for a past date from the user's cache directory."""
+        cache_file = self._rates_cache_file(date)
+        if cache_file is None or not cache_file.exists():
+            return None
+        try:
+            with cache_file.open() as f:
+                rates = json.load(f)
+        except (OSError, ValueError):
+            # Unreadable or corrupt cache file, fall back to the API
+            return None
+        if not isinstance(rates, dict) or not rates:
+            # Valid JSON but not a rate table, treat it as a miss too
+            return None
+        return rates
+    
+    def _save_rates_to_disk(self, date: str, rates: Dict[str, float]):
+        """Save rates for a past date to the user's cache directory."""
+        cache_file = self._rates_cache_file(date)
+        if cache_file is None or not rates:
+            return
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a unique temp file and swap it in, so concurrent saves can't tear the file
+            fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, prefix=f"{date}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(rates, f)
+                os.replace(tmp_name, cache_file)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        except OSError:
+            # Caching is best-effort; a read-only home directory shouldn't break lookups
+            pass
+    
+    def _fetch_historical_rates(self, date: str) -> Dict[str, float]:
+        """Fetch historical exchange rates for a date from the API."""
+        import requests
+        
         url = f"{self.base_url}/historical/{date}.json"
         params = {
             "app_id": self.api_key,
             "show_alternative": False,
             "prettyprint": False
         }
-        headers = {"accept": "application/json"}
         
         try:
-            response = requests.get(url, params=params, headers=headers)
+            response = self._get_session().get(url, params=params, timeout=self._timeout)
             
             # Handle authentication errors specifically
             if response.status_code == 401:
@@ -138,7 +348,7 @@ class FXAPI:
             
             response.raise_for_status()
             
-            data = response.json()
+            data = _json.loads(response.content)
             
             if 'error' in data:
                 raise FXAPIError(f"API Error: {data.get('message', 'Unknown error')}")
@@ -147,7 +357,7 @@ class FXAPI:
             
         except requests.exceptions.RequestException as e:
             raise FXAPIError(f"Network error: {str(e)}")
-        except KeyError as e:
+        except (KeyError, ValueError) as e:
             raise FXAPIError(f"Unexpected API response format: {str(e)}")
     
     def get_rate(self, date: str, currency: str) -> float:
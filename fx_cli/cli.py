@@ -2,7 +2,31 @@
 
 import click
 import datetime
-from .api import FXAPI, FXAPIError
+from .currencies import CURRENCY_CODES
+from .daemon import query_daemon
+from .errors import FXAPIError
+from .validation import is_valid_date
+
+
+def _echo_rate(date: str, currency: str, target_currency: str, rate: float):
+    """Print a fetched rate."""
+    if target_currency:
+        click.echo(f'FX rate for {date} {currency} to {target_currency}: {rate:,.4f}')
+    else:
+        click.echo(f'FX rate for {date} USD to {currency}: {rate:,.4f}')
+
+
+def _run_daemon(ctx: click.Context, param: click.Parameter, value: bool):
+    """Run the background daemon instead of a single lookup."""
+    if not value or ctx.resilient_parsing:
+        return
+    from .daemon import serve
+    try:
+        serve()
+    except FXAPIError as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        raise click.Abort()
+    ctx.exit()
 
 
 @click.command()
@@ -10,6 +34,8 @@ from .api import FXAPI, FXAPIError
 @click.argument('currency', type=str)
 @click.argument('target_currency', type=str, required=False)
 @click.option('--verbose', '-v', is_flag=True, help='Show verbose output')
+@click.option('--daemon', is_flag=True, is_eager=True, expose_value=False, callback=_run_daemon,
+              help='Run a background daemon that serves lookups to later invocations')
 def main(date: str, currency: str, target_currency: str = None, verbose: bool = False):
     """
     Get foreign exchange rates.
@@ -24,9 +50,7 @@ def main(date: str, currency: str, target_currency: str = None, verbose: bool =
             date = datetime.datetime.now().strftime('%Y-%m-%d')
         
         # Validate date format
-        try:
-            datetime.datetime.strptime(date, '%Y-%m-%d')
-        except ValueError:
+        if not is_valid_date(date):
             raise click.BadParameter(f"Invalid date format: {date}. Use YYYY-MM-DD or 'today'")
         
         # Normalize currency codes to uppercase
@@ -34,19 +58,39 @@ def main(date: str, currency: str, target_currency: str = None, verbose: bool =
         if target_currency:
             target_currency = target_currency.upper()
         
-        # Validate currency codes
+        # Validate currency codes locally so typos don't cost a network request
         if len(currency) != 3:
             raise click.BadParameter(f"Invalid currency code: {currency}. Must be 3 letters")
+        if currency not in CURRENCY_CODES:
+            raise click.BadParameter(f"Unknown currency code: {currency}")
         
         if target_currency and len(target_currency) != 3:
             raise click.BadParameter(f"Invalid target currency code: {target_currency}. Must be 3 letters")
-        
-        # Initialize API client
-        api = FXAPI()
+        if target_currency and target_currency not in CURRENCY_CODES:
+            raise click.BadParameter(f"Unknown target currency code: {target_currency}")
         
         if verbose:
             click.echo(f"Fetching rates for {date}...")
         
+        # Use a running daemon if there is one, skipping API client setup entirely
+        try:
+            rate = query_daemon(date, currency, target_currency)
+        except FXAPIError as e:
+            if "Invalid or expired API key" not in str(e):
+                raise
+            rate = None  # Fall back to the in-process path, which can prompt for a new key
+        if rate is not None:
+            if verbose:
+                click.echo("Served by fx daemon")
+            _echo_rate(date, currency, target_currency, rate)
+            return
+        
+        # Imported here so --help and invalid arguments don't pay for importing requests
+        from .api import FXAPI
+        
+        # Initialize API client
+        api = FXAPI()
+        
         # Try to get rates, with retry for API key errors
         max_retries = 1
         for attempt in range(max_retries + 1):
@@ -54,11 +98,10 @@ def main(date: str, currency: str, target_currency: str = None, verbose: bool =
                 if target_currency:
                     # Convert between two currencies
                     rate = api.convert_currency(date, currency, target_currency)
-                    click.echo(f'FX rate for {date} {currency} to {target_currency}: {rate:,.4f}')
                 else:
                     # Get rate relative to USD
                     rate = api.get_rate(date, currency)
-                    click.echo(f'FX rate for {date} USD to {currency}: {rate:,.4f}')
+                _echo_rate(date, currency, target_currency, rate)
                 break  # Success, exit retry loop
                 
             except FXAPIError as e:
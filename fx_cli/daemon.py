@@ -0,0 +1,224 @@
+"""Background daemon that keeps an FXAPI client warm between CLI invocations.
+
+The daemon listens on a Unix domain socket and answers one query per line:
+
+    request:  DATE<TAB>CURRENCY<TAB>TARGET_CURRENCY\\n   (target may be empty)
+    response: ok<TAB>RATE\\n  or  error<TAB>MESSAGE\\n
+"""
+
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .currencies import CURRENCY_CODES
+from .errors import FXAPIError
+from .validation import is_valid_date
+
+SOCKET_PATH = Path.home() / ".cache" / "fx-cli" / "sock"
+
+# Seconds without a client before the daemon shuts itself down
+IDLE_TIMEOUT = 300
+
+# Seconds the client waits to reach the daemon / for the daemon to answer
+CONNECT_TIMEOUT = 0.5
+RESPONSE_TIMEOUT = 60
+
+# Seconds the daemon waits on a client socket before dropping a stalled connection
+REQUEST_TIMEOUT = 5
+
+# How often the accept loop wakes up to check for idleness or shutdown
+_POLL_INTERVAL = 0.5
+
+
+def _supported() -> bool:
+    """Unix domain sockets aren't available on every platform (e.g. older Windows)."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def _stdin_is_foreground_tty() -> bool:
+    """Check whether we can prompt without being stopped (SIGTTIN) as a background job."""
+    try:
+        return sys.stdin.isatty() and os.tcgetpgrp(sys.stdin.fileno()) == os.getpgrp()
+    except (AttributeError, OSError, ValueError):
+        # No stdin, or no controlling terminal
+        return False
+
+
+def query_daemon(date: str, currency: str, target_currency: Optional[str] = None) -> Optional[float]:
+    """
+    Ask a running daemon for a rate.
+
+    Args:
+        date: Date in YYYY-MM-DD format
+        currency: 3-letter currency code
+        target_currency: Optional target currency for conversion
+
+    Returns:
+        The exchange rate, or None if no daemon is running
+
+    Raises:
+        FXAPIError: If the daemon reports an error
+    """
+    if not _supported() or not SOCKET_PATH.exists():
+        return None
+
+    request = f"{date}\t{currency}\t{target_currency or ''}\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(SOCKET_PATH))
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.sendall(request.encode())
+            with sock.makefile("r", encoding="utf-8") as reader:
+                response = reader.readline()
+    except OSError:
+        # Stale socket or unresponsive daemon, fall back to the in-process path
+        return None
+
+    status, _, payload = response.rstrip("\n").partition("\t")
+    if status == "ok":
+        try:
+            return float(payload)
+        except ValueError:
+            # Garbled reply, fall back to the in-process path
+            return None
+    if status == "error":
+        raise FXAPIError(payload)
+    return None
+
+
+def _lookup(api, date: str, currency: str, target_currency: str) -> float:
+    """Look up a rate, picking up a new API key once if the current one is rejected."""
+    for attempt in range(2):
+        try:
+            if target_currency:
+                return api.convert_currency(date, currency, target_currency)
+            return api.get_rate(date, currency)
+        except FXAPIError as e:
+            # The CLI saves a replacement key to the config file after an auth error
+            if "Invalid or expired API key" not in str(e) or attempt or not api.reload_api_key():
+                raise
+
+
+def _handle_query(api, line: str) -> Tuple[str, bool]:
+    """
+    Answer a single protocol line using the given FXAPI client.
+
+    Returns:
+        The reply line, and whether the daemon should keep serving
+    """
+    fields = line.rstrip("\n").split("\t")
+    if len(fields) != 3:
+        return "error\tMalformed daemon request\n", True
+
+    date, currency, target_currency = fields
+    # Other clients can speak the protocol too, so don't rely on the CLI's checks
+    if not is_valid_date(date):
+        return "error\tInvalid date format. Use YYYY-MM-DD\n", True
+    if currency not in CURRENCY_CODES:
+        return "error\tUnknown currency code\n", True
+    if target_currency and target_currency not in CURRENCY_CODES:
+        return "error\tUnknown target currency code\n", True
+
+    try:
+        rate = _lookup(api, date, currency, target_currency)
+    except FXAPIError as e:
+        # Keep the reply on a single line
+        message = " ".join(str(e).split())
+        # With no usable key every query would fail, so shut down and let the CLI take over
+        keep_serving = "Invalid or expired API key" not in message
+        return f"error\t{message}\n", keep_serving
+    except Exception as e:
+        # A bug or bad cache entry shouldn't take the daemon down; report it like the CLI does
+        message = " ".join(f"Unexpected error: {e}".split())
+        return f"error\t{message}\n", True
+    return f"ok\t{rate!r}\n", True
+
+
+def _serve_connection(api, conn: socket.socket, stop: threading.Event):
+    """Answer queries on one client connection until it closes or stalls."""
+    with conn:
+        conn.settimeout(REQUEST_TIMEOUT)
+        try:
+            with conn.makefile("rw", encoding="utf-8", errors="replace") as stream:
+                for line in stream:
+                    reply, keep_serving = _handle_query(api, line)
+                    stream.write(reply)
+                    stream.flush()
+                    if not keep_serving:
+                        stop.set()
+                        break
+        except (OSError, ValueError):
+            # A misbehaving client shouldn't take the daemon down
+            pass
+
+
+def _remove_stale_socket():
+    """Remove a leftover socket file, refusing if another daemon still owns it."""
+    if not SOCKET_PATH.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(SOCKET_PATH))
+        except OSError:
+            SOCKET_PATH.unlink()
+            return
+    raise FXAPIError(f"An fx daemon is already running on {SOCKET_PATH}")
+
+
+def serve(idle_timeout: float = IDLE_TIMEOUT):
+    """
+    Run the daemon until no client has been connected for idle_timeout seconds.
+
+    Raises:
+        FXAPIError: If the platform lacks Unix sockets, no API key is configured
+            and we can't prompt for one, or a daemon is already running
+    """
+    if not _supported():
+        raise FXAPIError("Daemon mode requires Unix domain socket support")
+
+    from .api import FXAPI
+
+    # Resolve the API key up front. Only prompt from a foreground terminal, since a
+    # backgrounded daemon reading stdin would be stopped and hang silently
+    api = FXAPI(interactive=_stdin_is_foreground_tty())
+
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    _remove_stale_socket()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(SOCKET_PATH))
+        try:
+            # The daemon answers with the user's API key, so only the user may connect
+            SOCKET_PATH.chmod(0o600)
+            server.listen()
+            server.settimeout(_POLL_INTERVAL)
+
+            # Each connection gets its own thread, so a slow fetch or a stalled client
+            # doesn't hold up everyone else; FXAPI's cache and session are thread-safe
+            stop = threading.Event()
+            workers = []
+            last_active = time.monotonic()
+            while not stop.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    workers = [worker for worker in workers if worker.is_alive()]
+                    if workers:
+                        last_active = time.monotonic()
+                    elif time.monotonic() - last_active >= idle_timeout:
+                        break
+                    continue
+
+                last_active = time.monotonic()
+                worker = threading.Thread(
+                    target=_serve_connection, args=(api, conn, stop), daemon=True
+                )
+                worker.start()
+                workers.append(worker)
+        finally:
+            SOCKET_PATH.unlink(missing_ok=True)
@@ -0,0 +1,6 @@
+"""Exceptions for FX CLI."""
+
+
+class FXAPIError(Exception):
+    """Custom exception for FX API errors."""
+    pass
@@ -0,0 +1,17 @@
+"""Input validation shared by the CLI, API client and daemon."""
+
+import datetime
+
+
+def is_valid_date(date: str) -> bool:
+    """Check that a string is a valid YYYY-MM-DD date (hand-rolled, strptime is slow)."""
+    if len(date) != 10 or not date.isascii() or date[4] != '-' or date[7] != '-':
+        return False
+    year, month, day = date[0:4], date[5:7], date[8:10]
+    if not (year.isdigit() and month.isdigit() and day.isdigit()):
+        return False
+    try:
+        datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return False
+    return True